@@ -0,0 +1,5 @@
+from dotenv import load_dotenv
+
+# Several modules read settings from the environment at import time, so .env must be
+# loaded before any of them are imported.
+load_dotenv()
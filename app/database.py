@@ -1,11 +1,36 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+import logging
+import os
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import UserDefinedOption, declarative_base, raiseload, sessionmaker
+from sqlalchemy.pool import QueuePool
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///./translation_office.db"
 
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False, "timeout": 30},
+    poolclass=QueuePool,
+    pool_size=20,
+    max_overflow=40,
+    pool_timeout=30,
+    # Connections held by long-lived WebSocket sessions may sit idle for a while.
+    pool_pre_ping=True,
+    pool_recycle=1800,
 )
+
+
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    # WAL lets readers proceed while a write is in progress.
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.close()
+
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -17,3 +42,32 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+class _ListQueryOption(UserDefinedOption):
+    """Marks rows loaded by a list query; carried along to their lazy loaders."""
+
+    propagate_to_loaders = True
+
+
+_LIST_QUERY = _ListQueryOption()
+
+
+def strict_options(*options):
+    """Guard list-query eager loading against N+1 regressions.
+
+    With ``ENV=dev`` ``raiseload("*")`` is appended, so any relationship a template
+    touches without an explicit eager load fails loudly. Elsewhere the rows are only
+    marked, and a lazy load from them is logged as a warning instead.
+    """
+    if os.getenv("ENV") == "dev":
+        return (*options, raiseload("*"))
+    return (*options, _LIST_QUERY)
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _warn_on_list_lazy_load(orm_execute_state) -> None:
+    if not orm_execute_state.is_select or orm_execute_state.lazy_loaded_from is None:
+        return
+    if any(isinstance(option, _ListQueryOption) for option in orm_execute_state.user_defined_options):
+        logging.warning("Lazy load of %s from a list query", orm_execute_state.loader_strategy_path)
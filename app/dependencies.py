@@ -2,7 +2,7 @@ from typing import Iterable, Optional
 
 from fastapi import Depends, HTTPException, Request
 from fastapi import status
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 
 from . import models
 from .database import get_db
@@ -28,10 +28,13 @@ class UnauthorizedError(HTTPException):
 
 
 def get_current_user(request: Request, db: Session = Depends(get_db)) -> Optional[models.User]:
+    # Resolved once per request; later dependency chains reuse the same row.
+    if hasattr(request.state, "current_user"):
+        return request.state.current_user
     user_id = request.session.get("user_id")
-    if user_id is None:
-        return None
-    return db.get(models.User, user_id)
+    user = db.get(models.User, user_id) if user_id is not None else None
+    request.state.current_user = user
+    return user
 
 
 def login_required(user: Optional[models.User] = Depends(get_current_user)) -> models.User:
@@ -55,8 +58,19 @@ def require_role(role: str):
     return require_roles(role)
 
 
+# Shared dependency objects so FastAPI resolves each role check once per request.
+require_client = require_role(ROLE_CLIENT)
+require_translator = require_role(ROLE_TRANSLATOR)
+require_manager = require_roles(ROLE_MANAGER, ROLE_ADMIN)
+
+
 def require_job_participant(job_id: int, db: Session, user: models.User) -> models.Job:
-    job = db.get(models.Job, job_id)
+    # The permission check reads job.request, so fetch it in the same SELECT.
+    job = db.get(
+        models.Job,
+        job_id,
+        options=[joinedload(models.Job.request).defer(models.TranslationRequest.source_text)],
+    )
     if not job:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
     allowed_user_ids = {
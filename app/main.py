@@ -1,11 +1,13 @@
+import hashlib
 import os
 from pathlib import Path
-from typing import Optional
 
-from dotenv import load_dotenv
 from fastapi import Depends, FastAPI, Request
-from fastapi.responses import RedirectResponse
+from fastapi.responses import ORJSONResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
+from filelock import FileLock
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 from starlette.middleware.sessions import SessionMiddleware
 
@@ -18,47 +20,72 @@ from .dependencies import (
     ROLE_ADMIN,
     get_current_user,
 )
-from .routers import auth, client, jobs, manager, translator
+from .routers import auth, client, jobs, manager, translator, uploads
 from .security import get_password_hash
 
-load_dotenv()
-
 BASE_DIR = Path(__file__).resolve().parent.parent
 UPLOAD_DIR = BASE_DIR / "uploads"
 UPLOAD_DIR.mkdir(exist_ok=True)
-(UPLOAD_DIR / "deliverables").mkdir(exist_ok=True)
-(UPLOAD_DIR / "invoices").mkdir(exist_ok=True)
+SCHEMA_LOCK = UPLOAD_DIR / ".schema.lock"
+SCHEMA_MARKER = UPLOAD_DIR / ".schema.ok"
 
-app = FastAPI(title="Translation Office App")
+app = FastAPI(title="Translation Office App", default_response_class=ORJSONResponse)
 app.add_middleware(SessionMiddleware, secret_key=os.getenv("SESSION_SECRET", "supersecretkey"))
 
 app.mount("/static", StaticFiles(directory=str(BASE_DIR / "app" / "static")), name="static")
-app.mount("/uploads", StaticFiles(directory=str(UPLOAD_DIR)), name="uploaded_files")
 
 app.include_router(auth.router)
 app.include_router(client.router)
 app.include_router(manager.router)
 app.include_router(translator.router)
 app.include_router(jobs.router)
+app.include_router(uploads.router)
+
+
+def _schema_fingerprint() -> str:
+    parts = []
+    for table in Base.metadata.sorted_tables:
+        parts.append(table.name)
+        parts.extend(column.name for column in table.columns)
+        parts.extend(sorted(index.name for index in table.indexes))
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()
 
 
 @app.on_event("startup")
 def startup() -> None:
-    Base.metadata.create_all(bind=engine)
-    create_defaults()
+    # With several workers only the first one to boot builds the schema and seeds defaults;
+    # the rest see the marker and skip straight to serving.
+    fingerprint = _schema_fingerprint()
+    with FileLock(str(SCHEMA_LOCK)):
+        database_path = Path(engine.url.database)
+        if database_path.exists() and SCHEMA_MARKER.exists() and SCHEMA_MARKER.read_text() == fingerprint:
+            return
+        Base.metadata.create_all(bind=engine)
+        # create_all skips indexes on existing tables, so add any that older databases lack;
+        # the rate seed upsert relies on ux_rates_language_pair.
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=engine, checkfirst=True)
+        create_defaults()
+        SCHEMA_MARKER.write_text(fingerprint)
+
+
+HOME_URLS = {
+    ROLE_CLIENT: "/client/dashboard",
+    ROLE_MANAGER: "/manager/dashboard",
+    ROLE_ADMIN: "/manager/dashboard",
+    ROLE_TRANSLATOR: "/translator/dashboard",
+}
 
 
 @app.get("/")
-def home(request: Request, user: Optional[models.User] = Depends(get_current_user)):
-    if not user:
-        return RedirectResponse(url="/login", status_code=302)
-    if user.role == ROLE_CLIENT:
-        return RedirectResponse(url="/client/dashboard", status_code=302)
-    if user.role == ROLE_MANAGER or user.role == ROLE_ADMIN:
-        return RedirectResponse(url="/manager/dashboard", status_code=302)
-    if user.role == ROLE_TRANSLATOR:
-        return RedirectResponse(url="/translator/dashboard", status_code=302)
-    return RedirectResponse(url="/login", status_code=302)
+def home(request: Request, db: Session = Depends(get_db)):
+    # The role is stored in the session at login; only older sessions need a user lookup.
+    role = request.session.get("role")
+    if role is None:
+        user = get_current_user(request, db)
+        role = user.role if user else None
+    return RedirectResponse(url=HOME_URLS.get(role, "/login"), status_code=302)
 
 
 def create_defaults() -> None:
@@ -70,28 +97,32 @@ def create_defaults() -> None:
             ("translator2@example.com", ROLE_TRANSLATOR, "translatorpass"),
             ("admin@example.com", ROLE_ADMIN, "adminpass"),
         ]
-        for username, role, password in default_users:
-            existing = db.query(models.User).filter(models.User.username == username).first()
-            if not existing:
-                db.add(
-                    models.User(
-                        username=username,
-                        role=role,
-                        password_hash=get_password_hash(password),
-                    )
-                )
+        usernames = [username for username, _, _ in default_users]
+        existing = set(db.scalars(select(models.User.username).where(models.User.username.in_(usernames))))
+        # Only hash passwords for accounts that are actually missing.
+        missing_users = [
+            {"username": username, "role": role, "password_hash": get_password_hash(password)}
+            for username, role, password in default_users
+            if username not in existing
+        ]
+        if missing_users:
+            db.execute(
+                sqlite_insert(models.User).values(missing_users).on_conflict_do_nothing(index_elements=["username"])
+            )
         default_rates = [
             ("EN", "IT", 0.10),
             ("IT", "EN", 0.10),
         ]
-        for source, target, price in default_rates:
-            rate = (
-                db.query(models.Rate)
-                .filter(models.Rate.source_language == source, models.Rate.target_language == target)
-                .first()
+        db.execute(
+            sqlite_insert(models.Rate)
+            .values(
+                [
+                    {"source_language": source, "target_language": target, "unit_price": price}
+                    for source, target, price in default_rates
+                ]
             )
-            if not rate:
-                db.add(models.Rate(source_language=source, target_language=target, unit_price=price))
+            .on_conflict_do_nothing(index_elements=["source_language", "target_language"])
+        )
         db.commit()
     finally:
         db.close()
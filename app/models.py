@@ -1,6 +1,4 @@
-from datetime import datetime
-
-from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, String, Text, func
 from sqlalchemy.orm import relationship
 
 from .database import Base
@@ -12,7 +10,7 @@ class User(Base):
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String, unique=True, index=True, nullable=False)
     password_hash = Column(String, nullable=False)
-    role = Column(String, nullable=False)
+    role = Column(String, nullable=False, index=True)
 
     translation_requests = relationship(
         "TranslationRequest", back_populates="client", foreign_keys="TranslationRequest.client_id"
@@ -24,6 +22,7 @@ class User(Base):
 
 class TranslationRequest(Base):
     __tablename__ = "translation_requests"
+    __table_args__ = (Index("ix_tr_client_created", "client_id", "created_at"),)
 
     id = Column(Integer, primary_key=True, index=True)
     client_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -34,7 +33,9 @@ class TranslationRequest(Base):
     translated_filename = Column(String, nullable=True)
     word_count = Column(Integer, default=0)
     source_text = Column(Text, default="")
-    created_at = Column(DateTime, default=datetime.utcnow)
+    # The client-side default renders CURRENT_TIMESTAMP in the INSERT itself, so tables
+    # created before the server default existed still get a timestamp.
+    created_at = Column(DateTime, default=func.now(), server_default=func.now())
 
     client = relationship("User", foreign_keys=[client_id], back_populates="translation_requests")
     quote = relationship("Quote", back_populates="request", uselist=False)
@@ -48,6 +49,7 @@ class TranslationRequest(Base):
 
 class Rate(Base):
     __tablename__ = "rates"
+    __table_args__ = (Index("ux_rates_language_pair", "source_language", "target_language", unique=True),)
 
     id = Column(Integer, primary_key=True, index=True)
     source_language = Column(String, nullable=False)
@@ -60,22 +62,23 @@ class Quote(Base):
     __tablename__ = "quotes"
 
     id = Column(Integer, primary_key=True, index=True)
-    request_id = Column(Integer, ForeignKey("translation_requests.id"), nullable=False)
+    request_id = Column(Integer, ForeignKey("translation_requests.id"), nullable=False, index=True)
     word_count = Column(Integer, nullable=False, default=0)
     unit_price = Column(Float, nullable=False)
     currency = Column(String, nullable=False, default="EUR")
     total = Column(Float, nullable=False, default=0)
     status = Column(String, nullable=False, default="Draft")
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=func.now(), server_default=func.now(), index=True)
 
     request = relationship("TranslationRequest", back_populates="quote")
 
 
 class Job(Base):
     __tablename__ = "jobs"
+    __table_args__ = (Index("ix_jobs_translator_status", "translator_id", "status"),)
 
     id = Column(Integer, primary_key=True, index=True)
-    request_id = Column(Integer, ForeignKey("translation_requests.id"), nullable=False)
+    request_id = Column(Integer, ForeignKey("translation_requests.id"), nullable=False, index=True)
     translator_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     status = Column(String, nullable=False, default="New")
     due_date = Column(DateTime, nullable=True)
@@ -93,12 +96,14 @@ class Job(Base):
 
 class Message(Base):
     __tablename__ = "messages"
+    # Fetch created_at in the INSERT (RETURNING) so chat payloads can be built right after flush.
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
-    job_id = Column(Integer, ForeignKey("jobs.id"), nullable=False)
+    job_id = Column(Integer, ForeignKey("jobs.id"), nullable=False, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     text = Column(Text, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=func.now(), server_default=func.now())
 
     job = relationship("Job", back_populates="messages")
     user = relationship("User", back_populates="messages")
@@ -106,10 +111,11 @@ class Message(Base):
 
 class Invoice(Base):
     __tablename__ = "invoices"
+    __table_args__ = (Index("ix_invoices_client_issued", "client_id", "issued_at"),)
 
     id = Column(Integer, primary_key=True, index=True)
     client_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    job_id = Column(Integer, ForeignKey("jobs.id"), nullable=False)
+    job_id = Column(Integer, ForeignKey("jobs.id"), nullable=False, index=True)
     amount = Column(Float, nullable=False)
     currency = Column(String, nullable=False, default="EUR")
     status = Column(String, nullable=False, default="Draft")
@@ -124,7 +130,7 @@ class Term(Base):
     __tablename__ = "terms"
 
     id = Column(Integer, primary_key=True, index=True)
-    client_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    client_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     source_term = Column(String, nullable=False)
     target_term = Column(String, nullable=False)
     notes = Column(Text, nullable=True)
@@ -136,10 +142,10 @@ class AuditLog(Base):
     __tablename__ = "audit_logs"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     action = Column(String, nullable=False)
     object_type = Column(String, nullable=False)
     object_id = Column(Integer, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=func.now(), server_default=func.now(), index=True)
 
     user = relationship("User", back_populates="audit_logs")
@@ -1,3 +1,3 @@
-from . import auth, client, jobs, manager, translator
+from . import auth, client, jobs, manager, translator, uploads
 
-__all__ = ["auth", "client", "jobs", "manager", "translator"]
+__all__ = ["auth", "client", "jobs", "manager", "translator", "uploads"]
@@ -1,19 +1,41 @@
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Form, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, Form, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import RedirectResponse
-from sqlalchemy.orm import Session
+from sqlalchemy import exists, select
+from sqlalchemy.orm import Session, load_only
 
 from .. import models
 from ..database import get_db
 from ..dependencies import get_current_user
-from ..security import get_password_hash, verify_password
-from ..services.audit import log_action
+from ..security import DUMMY_PASSWORD_HASH, get_password_hash_async, needs_rehash, verify_password_async
+from ..services.audit import log_action_in_background
 from ..template_loader import templates
 
 router = APIRouter()
 
 
+# login and register are async so the KDF can await its own executor; their database
+# calls still go through the threadpool so a locked SQLite write never blocks the loop.
+def _find_user(db: Session, username: str) -> Optional[models.User]:
+    return db.scalars(
+        select(models.User)
+        .where(models.User.username == username)
+        .options(load_only(models.User.id, models.User.password_hash, models.User.role))
+    ).one_or_none()
+
+
+def _username_taken(db: Session, username: str) -> bool:
+    return bool(db.scalar(select(exists().where(models.User.username == username))))
+
+
+def _save_user(db: Session, user: models.User) -> None:
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+
+
 @router.get("/login")
 def login_form(request: Request, user: Optional[models.User] = Depends(get_current_user)):
     if user:
@@ -22,19 +44,27 @@ def login_form(request: Request, user: Optional[models.User] = Depends(get_curre
 
 
 @router.post("/login")
-def login(
+async def login(
     request: Request,
+    background_tasks: BackgroundTasks,
     username: str = Form(...),
     password: str = Form(...),
     db: Session = Depends(get_db),
 ):
-    user = db.query(models.User).filter(models.User.username == username).first()
-    if not user or not verify_password(password, user.password_hash):
+    user = await run_in_threadpool(_find_user, db, username)
+    password_ok = await verify_password_async(
+        username, password, user.password_hash if user else DUMMY_PASSWORD_HASH
+    )
+    if not user or not password_ok:
         return templates.TemplateResponse(
             "login.html", {"request": request, "error": "Invalid username or password", "user": None}, status_code=400
         )
+    if needs_rehash(user.password_hash):
+        user.password_hash = await get_password_hash_async(password)
+        await run_in_threadpool(_save_user, db, user)
     request.session["user_id"] = user.id
-    log_action(db, user, "login", "user", user.id)
+    request.session["role"] = user.role
+    background_tasks.add_task(log_action_in_background, user.id, "login", "user", user.id)
     return RedirectResponse(url="/", status_code=302)
 
 
@@ -53,21 +83,20 @@ def register_form(request: Request, user: Optional[models.User] = Depends(get_cu
 
 
 @router.post("/register")
-def register(
+async def register(
     request: Request,
+    background_tasks: BackgroundTasks,
     username: str = Form(...),
     password: str = Form(...),
     db: Session = Depends(get_db),
 ):
-    existing_user = db.query(models.User).filter(models.User.username == username).first()
-    if existing_user:
+    if await run_in_threadpool(_username_taken, db, username):
         return templates.TemplateResponse(
             "register.html", {"request": request, "error": "Username already taken", "user": None}, status_code=400
         )
-    user = models.User(username=username, password_hash=get_password_hash(password), role="client")
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+    user = models.User(username=username, password_hash=await get_password_hash_async(password), role="client")
+    await run_in_threadpool(_save_user, db, user)
     request.session["user_id"] = user.id
-    log_action(db, user, "register", "user", user.id)
+    request.session["role"] = user.role
+    background_tasks.add_task(log_action_in_background, user.id, "register", "user", user.id)
     return RedirectResponse(url="/client/dashboard", status_code=302)
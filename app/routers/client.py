@@ -1,48 +1,63 @@
-from datetime import datetime
+import time
 from pathlib import Path
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, Request, UploadFile
-from fastapi.responses import FileResponse, RedirectResponse
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, File, Form, HTTPException, Request, UploadFile
+from fastapi.responses import RedirectResponse
+from sqlalchemy.orm import Session, defer, joinedload
 
 from .. import models
-from ..database import get_db
-from ..dependencies import ROLE_CLIENT, ROLE_MANAGER, require_role
+from ..database import get_db, strict_options
+from ..dependencies import require_client
 from ..services import jobs as job_service
 from ..services.audit import log_action
-from ..services.emails import send_email
-from ..services.files import count_words, extract_text_from_file
-from ..services.quotes import create_or_update_quote, mark_quote_status
+from ..services.cache import list_manager_usernames
+from ..services.emails import queue_email
+from ..services.files import (
+    count_words,
+    extract_text_from_file,
+    has_expected_signature,
+    save_upload,
+    upload_file_response,
+)
+from ..services.quotes import create_or_update_quote, load_quote, mark_quote_status
 from ..template_loader import templates
 from ..utils.flash import pop_flash, set_flash
 
 router = APIRouter()
 BASE_UPLOAD_DIR = Path("uploads")
 BASE_UPLOAD_DIR.mkdir(exist_ok=True)
+ALLOWED_UPLOAD_TYPES = frozenset(
+    {
+        "application/pdf",
+        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        "application/msword",
+        "text/plain",
+    }
+)
 
 
 @router.get("/client/dashboard")
 def dashboard(
     request: Request,
-    user: models.User = Depends(require_role(ROLE_CLIENT)),
+    user: models.User = Depends(require_client),
     db: Session = Depends(get_db),
 ):
     translation_requests = (
         db.query(models.TranslationRequest)
+        .options(
+            *strict_options(
+                defer(models.TranslationRequest.source_text),
+                joinedload(models.TranslationRequest.quote),
+                joinedload(models.TranslationRequest.job).defer(models.Job.translated_text),
+            )
+        )
         .filter(models.TranslationRequest.client_id == user.id)
         .order_by(models.TranslationRequest.created_at.desc())
         .all()
     )
+    # Every request row is already loaded for the table, so counting here costs no extra queries.
     pending_quotes = sum(1 for req in translation_requests if req.quote and req.quote.status == "Sent")
     delivered_jobs = sum(1 for req in translation_requests if req.job and req.job.status == "Delivered")
-    invoices = (
-        db.query(models.Invoice)
-        .join(models.Job)
-        .join(models.TranslationRequest)
-        .filter(models.TranslationRequest.client_id == user.id)
-        .order_by(models.Invoice.issued_at.desc().nullslast(), models.Invoice.id.desc())
-        .all()
-    )
     flash = pop_flash(request)
     return templates.TemplateResponse(
         "client_dashboard.html",
@@ -52,14 +67,13 @@ def dashboard(
             "translation_requests": translation_requests,
             "pending_quotes": pending_quotes,
             "delivered_jobs": delivered_jobs,
-            "invoices": invoices,
             "flash": flash,
         },
     )
 
 
 @router.get("/client/request")
-def request_form(request: Request, user: models.User = Depends(require_role(ROLE_CLIENT))):
+def request_form(request: Request, user: models.User = Depends(require_client)):
     return templates.TemplateResponse(
         "client_request.html", {"request": request, "user": user, "error": None}
     )
@@ -71,16 +85,10 @@ def create_request(
     source_language: str = Form(...),
     target_language: str = Form(...),
     file: UploadFile = File(...),
-    user: models.User = Depends(require_role(ROLE_CLIENT)),
+    user: models.User = Depends(require_client),
     db: Session = Depends(get_db),
 ):
-    allowed_types = {
-        "application/pdf",
-        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        "application/msword",
-        "text/plain",
-    }
-    if file.content_type not in allowed_types:
+    if file.content_type not in ALLOWED_UPLOAD_TYPES or not has_expected_signature(file):
         return templates.TemplateResponse(
             "client_request.html",
             {
@@ -91,12 +99,8 @@ def create_request(
             status_code=400,
         )
 
-    filename = f"client_{user.id}_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}_{file.filename}"
-    filepath = BASE_UPLOAD_DIR / filename
-    with filepath.open("wb") as f:
-        contents = file.file.read()
-        f.write(contents)
-    file.file.close()
+    filename = f"client_{user.id}_{int(time.time() * 1000)}_{file.filename}"
+    filepath = save_upload(file, BASE_UPLOAD_DIR / filename)
 
     translation_request = models.TranslationRequest(
         client_id=user.id,
@@ -104,19 +108,16 @@ def create_request(
         target_language=target_language,
         status="New",
         original_filename=filename,
-        created_at=datetime.utcnow(),
     )
     db.add(translation_request)
-    db.commit()
-    db.refresh(translation_request)
 
     text, _ = extract_text_from_file(filepath)
     translation_request.source_text = text
     translation_request.word_count = count_words(text)
-    db.add(translation_request)
-    db.commit()
-    create_or_update_quote(db, translation_request, translation_request.word_count)
+    db.flush()
     log_action(db, user, "upload_request", "translation_request", translation_request.id)
+    create_or_update_quote(db, translation_request, translation_request.word_count)
+    db.commit()
     set_flash(request, "Request received. Quote generated.")
     return RedirectResponse(url="/client/dashboard", status_code=302)
 
@@ -125,10 +126,10 @@ def create_request(
 def view_quote(
     request: Request,
     quote_id: int,
-    user: models.User = Depends(require_role(ROLE_CLIENT)),
+    user: models.User = Depends(require_client),
     db: Session = Depends(get_db),
 ):
-    quote = db.get(models.Quote, quote_id)
+    quote = load_quote(db, quote_id)
     if not quote or quote.request.client_id != user.id:
         raise HTTPException(status_code=404, detail="Quote not found")
     flash = pop_flash(request)
@@ -141,26 +142,29 @@ def view_quote(
 @router.post("/client/quotes/{quote_id}/approve")
 def approve_quote(
     quote_id: int,
-    user: models.User = Depends(require_role(ROLE_CLIENT)),
+    request: Request,
+    background_tasks: BackgroundTasks,
+    user: models.User = Depends(require_client),
     db: Session = Depends(get_db),
 ):
-    quote = db.get(models.Quote, quote_id)
+    quote = load_quote(db, quote_id)
     if not quote or quote.request.client_id != user.id:
         raise HTTPException(status_code=404, detail="Quote not found")
     mark_quote_status(db, quote, "Approved")
     job = job_service.ensure_job_for_request(db, quote.request)
     job.status = "New"
     db.add(job)
+    log_action(db, user, "quote_approved", "quote", quote.id)
     db.commit()
-    manager_recipients = [m.username for m in db.query(models.User).filter(models.User.role == ROLE_MANAGER).all()]
+    manager_recipients = list_manager_usernames(db)
     recipients = manager_recipients + [quote.request.client.username]
-    send_email(
+    queue_email(
+        background_tasks,
         subject="Quote Approved",
         recipients=recipients,
         template_name="quote_approved.html",
         context={"quote": quote},
     )
-    log_action(db, user, "quote_approved", "quote", quote.id)
     set_flash(request, "Quote approved. Our team will start processing your job shortly.")
     return RedirectResponse(url=f"/client/quotes/{quote_id}", status_code=302)
 
@@ -168,14 +172,16 @@ def approve_quote(
 @router.post("/client/quotes/{quote_id}/reject")
 def reject_quote(
     quote_id: int,
-    user: models.User = Depends(require_role(ROLE_CLIENT)),
+    request: Request,
+    user: models.User = Depends(require_client),
     db: Session = Depends(get_db),
 ):
-    quote = db.get(models.Quote, quote_id)
+    quote = load_quote(db, quote_id)
     if not quote or quote.request.client_id != user.id:
         raise HTTPException(status_code=404, detail="Quote not found")
     mark_quote_status(db, quote, "Rejected")
     log_action(db, user, "quote_rejected", "quote", quote.id)
+    db.commit()
     set_flash(request, "Quote rejected.", "warning")
     return RedirectResponse(url=f"/client/quotes/{quote_id}", status_code=302)
 
@@ -183,14 +189,13 @@ def reject_quote(
 @router.get("/client/invoices")
 def list_invoices(
     request: Request,
-    user: models.User = Depends(require_role(ROLE_CLIENT)),
+    user: models.User = Depends(require_client),
     db: Session = Depends(get_db),
 ):
+    # Invoices carry their client_id, so ix_invoices_client_issued serves both the filter and the sort.
     invoices = (
         db.query(models.Invoice)
-        .join(models.Job)
-        .join(models.TranslationRequest)
-        .filter(models.TranslationRequest.client_id == user.id)
+        .filter(models.Invoice.client_id == user.id)
         .order_by(models.Invoice.issued_at.desc().nullslast())
         .all()
     )
@@ -203,13 +208,12 @@ def list_invoices(
 @router.get("/client/invoices/{invoice_id}/download")
 def download_invoice(
     invoice_id: int,
-    user: models.User = Depends(require_role(ROLE_CLIENT)),
+    user: models.User = Depends(require_client),
     db: Session = Depends(get_db),
 ):
     invoice = db.get(models.Invoice, invoice_id)
     if not invoice or invoice.job.request.client_id != user.id or not invoice.pdf_path:
         raise HTTPException(status_code=404, detail="Invoice not found")
-    filepath = Path("uploads") / invoice.pdf_path
-    if not filepath.exists():
-        raise HTTPException(status_code=404, detail="Invoice file missing")
-    return FileResponse(filepath, media_type="application/pdf", filename=filepath.name)
+    return upload_file_response(
+        invoice.pdf_path, media_type="application/pdf", filename=Path(invoice.pdf_path).name
+    )
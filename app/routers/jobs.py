@@ -1,12 +1,14 @@
-from datetime import datetime
-from typing import Dict, List
+import asyncio
+from typing import Dict, Set
 
+import orjson
 from fastapi import APIRouter, Depends, Form, HTTPException, Request, WebSocket, WebSocketDisconnect
-from fastapi.responses import JSONResponse, RedirectResponse
-from sqlalchemy.orm import Session
+from fastapi.responses import ORJSONResponse, RedirectResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload
 
 from .. import models
-from ..database import SessionLocal, get_db
+from ..database import get_db
 from ..dependencies import login_required, require_job_participant
 from ..services import jobs as job_service
 from ..services.audit import log_action
@@ -19,21 +21,33 @@ router = APIRouter()
 
 class ConnectionManager:
     def __init__(self) -> None:
-        self.connections: Dict[int, List[WebSocket]] = {}
+        self.connections: Dict[int, Set[WebSocket]] = {}
 
     async def connect(self, job_id: int, websocket: WebSocket) -> None:
         await websocket.accept()
-        self.connections.setdefault(job_id, []).append(websocket)
+        self.connections.setdefault(job_id, set()).add(websocket)
 
     def disconnect(self, job_id: int, websocket: WebSocket) -> None:
-        if job_id in self.connections:
-            self.connections[job_id] = [conn for conn in self.connections[job_id] if conn != websocket]
-            if not self.connections[job_id]:
-                self.connections.pop(job_id)
+        connections = self.connections.get(job_id)
+        if connections is None:
+            return
+        connections.discard(websocket)
+        if not connections:
+            self.connections.pop(job_id, None)
 
     async def broadcast(self, job_id: int, message: dict) -> None:
-        for connection in self.connections.get(job_id, []):
-            await connection.send_json(message)
+        connections = list(self.connections.get(job_id, []))
+        if not connections:
+            return
+        # Serialize once and fan out concurrently so one slow socket does not hold up the rest.
+        # Sent as a text frame because the chat page JSON.parses event.data.
+        data = orjson.dumps(message).decode()
+        results = await asyncio.gather(
+            *(connection.send_text(data) for connection in connections), return_exceptions=True
+        )
+        for connection, result in zip(connections, results):
+            if isinstance(result, Exception):
+                self.disconnect(job_id, connection)
 
 
 connection_manager = ConnectionManager()
@@ -46,7 +60,7 @@ def job_detail(
     user: models.User = Depends(login_required),
     db: Session = Depends(get_db),
 ):
-    job = db.get(models.Job, job_id)
+    job = job_service.load_job(db, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     if not job_service.can_view_job(user, job):
@@ -54,7 +68,7 @@ def job_detail(
     messages = (
         db.query(models.Message)
         .filter(models.Message.job_id == job_id)
-        .order_by(models.Message.created_at.asc())
+        .order_by(models.Message.created_at.asc(), models.Message.id.asc())
         .all()
     )
     flash = pop_flash(request)
@@ -83,23 +97,24 @@ async def post_message(
     sanitized = sanitize_message(text)
     if not sanitized:
         if "application/json" in request.headers.get("accept", ""):
-            return JSONResponse({"detail": "Message cannot be empty"}, status_code=400)
+            return ORJSONResponse({"detail": "Message cannot be empty"}, status_code=400)
         set_flash(request, "Cannot send empty message.", "warning")
         return RedirectResponse(url=f"/jobs/{job_id}", status_code=302)
-    message = models.Message(job_id=job_id, user_id=user.id, text=sanitized, created_at=datetime.utcnow())
+    message = models.Message(job_id=job_id, user_id=user.id, text=sanitized)
     db.add(message)
-    db.commit()
-    db.refresh(message)
+    # log_action flushes, which assigns message.id; build the payload before the
+    # commit expires the instance so no refresh round-trip is needed.
     log_action(db, user, "message_posted", "job", job_id)
     payload = {
         "id": message.id,
-        "user": message.user.username,
-        "text": message.text,
-        "created_at": message.created_at.isoformat(),
+        "user": user.username,
+        "text": sanitized,
+        "created_at": message.created_at,
     }
+    db.commit()
     await connection_manager.broadcast(job_id, payload)
     if "application/json" in request.headers.get("accept", ""):
-        return JSONResponse(payload)
+        return ORJSONResponse(payload)
     return RedirectResponse(url=f"/jobs/{job_id}", status_code=302)
 
 
@@ -109,7 +124,7 @@ def list_messages(job_id: int, user: models.User = Depends(login_required), db:
     messages = (
         db.query(models.Message)
         .filter(models.Message.job_id == job_id)
-        .order_by(models.Message.created_at.asc())
+        .order_by(models.Message.created_at.asc(), models.Message.id.asc())
         .all()
     )
     payload = [
@@ -117,47 +132,53 @@ def list_messages(job_id: int, user: models.User = Depends(login_required), db:
             "id": msg.id,
             "user": msg.user.username,
             "text": msg.text,
-            "created_at": msg.created_at.isoformat(),
+            "created_at": msg.created_at,
         }
         for msg in messages
     ]
-    return JSONResponse(payload)
+    return ORJSONResponse(payload)
 
 
 @router.websocket("/ws/jobs/{job_id}")
-async def job_ws(websocket: WebSocket, job_id: int):
+async def job_ws(websocket: WebSocket, job_id: int, db: Session = Depends(get_db)):
     await connection_manager.connect(job_id, websocket)
-    db = SessionLocal()
     try:
         user_id = websocket.scope.get("session", {}).get("user_id")
         if not user_id:
             await websocket.close(code=1008)
             return
-        user = db.get(models.User, user_id)
-        job = db.get(models.Job, job_id)
-        if not job or user is None:
+        row = db.execute(
+            select(models.Job, models.User)
+            .join(models.User, models.User.id == user_id)
+            .options(joinedload(models.Job.request).defer(models.TranslationRequest.source_text))
+            .where(models.Job.id == job_id)
+        ).one_or_none()
+        if row is None:
             await websocket.close(code=1008)
             return
+        job, user = row
         if not job_service.can_view_job(user, job):
             await websocket.close(code=1008)
             return
+        # Each commit expires ``user``; keep plain copies so messages don't re-select the users row.
+        user_id, username = user.id, user.username
         while True:
             data = await websocket.receive_text()
             sanitized = sanitize_message(data)
             if not sanitized:
                 continue
-            message = models.Message(job_id=job_id, user_id=user.id, text=sanitized, created_at=datetime.utcnow())
+            message = models.Message(job_id=job_id, user_id=user_id, text=sanitized)
             db.add(message)
-            db.commit()
-            db.refresh(message)
+            db.flush()
             payload = {
                 "id": message.id,
-                "user": user.username,
-                "text": message.text,
-                "created_at": message.created_at.isoformat(),
+                "user": username,
+                "text": sanitized,
+                "created_at": message.created_at,
             }
+            db.commit()
             await connection_manager.broadcast(job_id, payload)
     except WebSocketDisconnect:
-        connection_manager.disconnect(job_id, websocket)
+        pass
     finally:
-        db.close()
+        connection_manager.disconnect(job_id, websocket)
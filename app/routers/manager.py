@@ -1,24 +1,32 @@
 from datetime import datetime
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Form, HTTPException, Query, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, Form, HTTPException, Query, Request
 from fastapi.responses import RedirectResponse
-from sqlalchemy import or_
-from sqlalchemy.orm import Session
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session, contains_eager, defer, load_only, selectinload
 
 from .. import models
-from ..database import get_db
-from ..dependencies import ROLE_ADMIN, ROLE_MANAGER, require_roles
+from ..database import get_db, strict_options
+from ..dependencies import ROLE_CLIENT, require_manager
 from ..services import jobs as job_service
 from ..services.audit import log_action
-from ..services.emails import send_email
-from ..services.invoices import generate_invoice_pdf
-from ..services.quotes import create_or_update_quote, mark_quote_status
+from ..services.cache import list_translators
+from ..services.emails import queue_email
+from ..services.invoices import claim_invoice_render, generate_invoice_pdf_in_background, invoice_details
+from ..services.quotes import create_or_update_quote, load_quote, mark_quote_status
 from ..template_loader import templates
 from ..utils.flash import pop_flash, set_flash
 
 router = APIRouter()
 
+# Built once so each glossary request only binds parameters; SQLAlchemy's
+# compiled cache then reuses the SQL string.
+GLOSSARY_CLIENTS = select(models.User.id, models.User.username).where(models.User.role == ROLE_CLIENT)
+GLOSSARY_TERMS = select(models.Term).options(
+    *strict_options(selectinload(models.Term.client).load_only(models.User.id, models.User.username))
+)
+
 
 def _get_pagination(page: int, page_size: int = 10) -> tuple[int, int]:
     offset = max(page - 1, 0) * page_size
@@ -28,15 +36,13 @@ def _get_pagination(page: int, page_size: int = 10) -> tuple[int, int]:
 @router.get("/manager/dashboard")
 def dashboard(
     request: Request,
-    user: models.User = Depends(require_roles(ROLE_MANAGER, ROLE_ADMIN)),
+    user: models.User = Depends(require_manager),
     db: Session = Depends(get_db),
     page: int = Query(1, ge=1),
     search: Optional[str] = Query(None),
 ):
-    query = (
-        db.query(models.TranslationRequest)
-        .join(models.User, models.TranslationRequest.client_id == models.User.id)
-        .order_by(models.TranslationRequest.created_at.desc())
+    query = db.query(models.TranslationRequest).join(
+        models.User, models.TranslationRequest.client_id == models.User.id
     )
     if search:
         pattern = f"%{search}%"
@@ -47,19 +53,82 @@ def dashboard(
                 models.TranslationRequest.target_language.ilike(pattern),
             )
         )
-    total_requests = query.count()
+    total_requests = query.with_entities(func.count(models.TranslationRequest.id)).scalar()
     offset, limit = _get_pagination(page)
-    translation_requests = query.offset(offset).limit(limit).all()
+    translation_requests = (
+        query.options(
+            *strict_options(
+                load_only(
+                    models.TranslationRequest.id,
+                    models.TranslationRequest.client_id,
+                    models.TranslationRequest.source_language,
+                    models.TranslationRequest.target_language,
+                    models.TranslationRequest.status,
+                    models.TranslationRequest.word_count,
+                    models.TranslationRequest.created_at,
+                ),
+                # The client is already joined for the search filter; populate it from that row.
+                contains_eager(models.TranslationRequest.client).load_only(models.User.id, models.User.username),
+                selectinload(models.TranslationRequest.quote),
+                selectinload(models.TranslationRequest.job).defer(models.Job.translated_text),
+            )
+        )
+        .order_by(models.TranslationRequest.created_at.desc())
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
 
-    quotes = db.query(models.Quote).order_by(models.Quote.created_at.desc()).limit(10).all()
-    jobs = db.query(models.Job).order_by(models.Job.id.desc()).limit(10).all()
-    recent_logs = db.query(models.AuditLog).order_by(models.AuditLog.created_at.desc()).limit(20).all()
+    quotes = (
+        db.query(models.Quote)
+        .options(
+            *strict_options(
+                selectinload(models.Quote.request).options(
+                    defer(models.TranslationRequest.source_text),
+                    selectinload(models.TranslationRequest.client),
+                )
+            )
+        )
+        .order_by(models.Quote.created_at.desc())
+        .limit(10)
+        .all()
+    )
+    jobs = (
+        db.query(models.Job)
+        .options(
+            *strict_options(
+                defer(models.Job.translated_text),
+                selectinload(models.Job.request).options(
+                    defer(models.TranslationRequest.source_text),
+                    selectinload(models.TranslationRequest.client),
+                ),
+            )
+        )
+        .order_by(models.Job.id.desc())
+        .limit(10)
+        .all()
+    )
+    recent_logs = (
+        db.query(models.AuditLog)
+        .options(
+            *strict_options(
+                selectinload(models.AuditLog.user).load_only(models.User.id, models.User.username),
+            )
+        )
+        .order_by(models.AuditLog.created_at.desc())
+        .limit(20)
+        .all()
+    )
 
-    pending_quotes = db.query(models.Quote).filter(models.Quote.status == "Sent").count()
-    open_jobs = db.query(models.Job).filter(models.Job.status.in_(["New", "Assigned", "InProgress"])).count()
-    invoices_count = db.query(models.Invoice).count()
+    pending_quotes, open_jobs, invoices_count = db.query(
+        db.query(func.count(models.Quote.id)).filter(models.Quote.status == "Sent").scalar_subquery(),
+        db.query(func.count(models.Job.id))
+        .filter(models.Job.status.in_(["New", "Assigned", "InProgress"]))
+        .scalar_subquery(),
+        db.query(func.count(models.Invoice.id)).scalar_subquery(),
+    ).one()
 
-    translators = db.query(models.User).filter(models.User.role == "translator").all()
+    translators = list_translators(db)
 
     flash = pop_flash(request)
     return templates.TemplateResponse(
@@ -90,13 +159,14 @@ def update_quote(
     request: Request,
     unit_price: float = Form(...),
     db: Session = Depends(get_db),
-    user: models.User = Depends(require_roles(ROLE_MANAGER, ROLE_ADMIN)),
+    user: models.User = Depends(require_manager),
 ):
-    quote = db.get(models.Quote, quote_id)
+    quote = load_quote(db, quote_id)
     if not quote:
         raise HTTPException(status_code=404, detail="Quote not found")
     create_or_update_quote(db, quote.request, quote.word_count, unit_price=unit_price)
     log_action(db, user, "quote_updated", "quote", quote.id)
+    db.commit()
     set_flash(request, "Quote updated.")
     return RedirectResponse(url="/manager/dashboard", status_code=302)
 
@@ -104,25 +174,27 @@ def update_quote(
 @router.post("/manager/quotes/{quote_id}/send")
 def send_quote(
     quote_id: int,
+    background_tasks: BackgroundTasks,
     request: Request,
     db: Session = Depends(get_db),
-    user: models.User = Depends(require_roles(ROLE_MANAGER, ROLE_ADMIN)),
+    user: models.User = Depends(require_manager),
 ):
-    quote = db.get(models.Quote, quote_id)
+    quote = load_quote(db, quote_id)
     if not quote:
         raise HTTPException(status_code=404, detail="Quote not found")
     mark_quote_status(db, quote, "Sent")
     quote.request.status = "Quoted"
     db.add(quote.request)
+    log_action(db, user, "quote_sent", "quote", quote.id)
     db.commit()
     client = quote.request.client
-    send_email(
+    queue_email(
+        background_tasks,
         subject="New Quote Available",
         recipients=[client.username],
         template_name="quote_sent.html",
         context={"quote": quote},
     )
-    log_action(db, user, "quote_sent", "quote", quote.id)
     set_flash(request, "Quote sent to client.")
     return RedirectResponse(url="/manager/dashboard", status_code=302)
 
@@ -130,14 +202,15 @@ def send_quote(
 @router.post("/manager/jobs/{job_id}/assign")
 def assign_job(
     job_id: int,
+    background_tasks: BackgroundTasks,
     request: Request,
     translator_id: Optional[int] = Form(None),
     due_date: Optional[str] = Form(None),
     notes: Optional[str] = Form(None),
     db: Session = Depends(get_db),
-    user: models.User = Depends(require_roles(ROLE_MANAGER, ROLE_ADMIN)),
+    user: models.User = Depends(require_manager),
 ):
-    job = db.get(models.Job, job_id)
+    job = job_service.load_job(db, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     translator = db.get(models.User, translator_id) if translator_id else None
@@ -153,10 +226,11 @@ def assign_job(
         raise HTTPException(status_code=400, detail=str(exc))
     job.manager_comment = None
     db.add(job)
-    db.commit()
     log_action(db, user, "job_assigned", "job", job.id)
+    db.commit()
     if translator:
-        send_email(
+        queue_email(
+            background_tasks,
             subject="New Job Assigned",
             recipients=[translator.username],
             template_name="job_assigned.html",
@@ -171,14 +245,15 @@ def accept_job(
     job_id: int,
     request: Request,
     db: Session = Depends(get_db),
-    user: models.User = Depends(require_roles(ROLE_MANAGER, ROLE_ADMIN)),
+    user: models.User = Depends(require_manager),
 ):
-    job = db.get(models.Job, job_id)
+    job = job_service.load_job(db, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     job.manager_comment = None
     job_service.update_job_status(db, job, "Accepted")
     log_action(db, user, "job_accepted", "job", job.id)
+    db.commit()
     set_flash(request, "Job accepted.")
     return RedirectResponse(url="/manager/dashboard", status_code=302)
 
@@ -189,14 +264,15 @@ def return_job(
     request: Request,
     comment: str = Form(...),
     db: Session = Depends(get_db),
-    user: models.User = Depends(require_roles(ROLE_MANAGER, ROLE_ADMIN)),
+    user: models.User = Depends(require_manager),
 ):
-    job = db.get(models.Job, job_id)
+    job = job_service.load_job(db, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     job.manager_comment = comment
     job_service.update_job_status(db, job, "Assigned")
     log_action(db, user, "job_returned", "job", job.id)
+    db.commit()
     set_flash(request, "Job returned to translator.", "warning")
     return RedirectResponse(url="/manager/dashboard", status_code=302)
 
@@ -205,14 +281,25 @@ def return_job(
 def generate_invoice(
     job_id: int,
     request: Request,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
-    user: models.User = Depends(require_roles(ROLE_MANAGER, ROLE_ADMIN)),
+    user: models.User = Depends(require_manager),
 ):
-    job = db.get(models.Job, job_id)
+    job = job_service.load_job(db, job_id)
     if not job or job.status not in {"Delivered", "Accepted"}:
         raise HTTPException(status_code=400, detail="Job not ready for invoicing")
     if job.invoice:
-        set_flash(request, "Invoice already generated.", "warning")
+        if job.invoice.pdf_path:
+            set_flash(request, "Invoice already generated.", "warning")
+            return RedirectResponse(url="/manager/dashboard", status_code=302)
+        if not claim_invoice_render(job.invoice.id):
+            set_flash(request, "Invoice PDF is still being generated.", "warning")
+            return RedirectResponse(url="/manager/dashboard", status_code=302)
+        # An earlier background render failed; render the existing invoice again.
+        background_tasks.add_task(
+            generate_invoice_pdf_in_background, job.invoice.id, invoice_details(db, job.invoice)
+        )
+        set_flash(request, "Invoice PDF is being regenerated.")
         return RedirectResponse(url="/manager/dashboard", status_code=302)
     invoice = models.Invoice(
         client_id=job.request.client_id,
@@ -221,11 +308,14 @@ def generate_invoice(
         currency=job.request.quote.currency if job.request.quote else "EUR",
     )
     db.add(invoice)
-    db.commit()
-    db.refresh(invoice)
-    generate_invoice_pdf(db, invoice)
+    db.flush()
     log_action(db, user, "invoice_generated", "invoice", invoice.id)
-    set_flash(request, "Invoice generated.")
+    details = invoice_details(db, invoice)
+    db.commit()
+    claim_invoice_render(invoice.id)
+    # ReportLab rendering is CPU-bound; do it after the response and commit the path once the file exists.
+    background_tasks.add_task(generate_invoice_pdf_in_background, invoice.id, details)
+    set_flash(request, "Invoice generated. The PDF will be available shortly.")
     return RedirectResponse(url="/manager/dashboard", status_code=302)
 
 
@@ -233,14 +323,14 @@ def generate_invoice(
 def glossary(
     request: Request,
     client_id: Optional[int] = Query(None),
-    user: models.User = Depends(require_roles(ROLE_MANAGER, ROLE_ADMIN)),
+    user: models.User = Depends(require_manager),
     db: Session = Depends(get_db),
 ):
-    clients = db.query(models.User).filter(models.User.role == "client").all()
+    clients = db.execute(GLOSSARY_CLIENTS).all()
+    statement = GLOSSARY_TERMS
     if client_id:
-        terms = db.query(models.Term).filter(models.Term.client_id == client_id).all()
-    else:
-        terms = db.query(models.Term).all()
+        statement = statement.where(models.Term.client_id == client_id)
+    terms = db.scalars(statement).all()
     flash = pop_flash(request)
     return templates.TemplateResponse(
         "manager_glossary.html",
@@ -262,7 +352,7 @@ def add_term(
     source_term: str = Form(...),
     target_term: str = Form(...),
     notes: Optional[str] = Form(None),
-    user: models.User = Depends(require_roles(ROLE_MANAGER, ROLE_ADMIN)),
+    user: models.User = Depends(require_manager),
     db: Session = Depends(get_db),
 ):
     term = models.Term(
@@ -272,8 +362,9 @@ def add_term(
         notes=notes,
     )
     db.add(term)
-    db.commit()
+    db.flush()
     log_action(db, user, "term_created", "term", term.id)
+    db.commit()
     set_flash(request, "Term added.")
     return RedirectResponse(url="/manager/glossary", status_code=302)
 
@@ -282,13 +373,13 @@ def add_term(
 def delete_term(
     request: Request,
     term_id: int,
-    user: models.User = Depends(require_roles(ROLE_MANAGER, ROLE_ADMIN)),
+    user: models.User = Depends(require_manager),
     db: Session = Depends(get_db),
 ):
     term = db.get(models.Term, term_id)
     if term:
         db.delete(term)
-        db.commit()
         log_action(db, user, "term_deleted", "term", term_id)
+        db.commit()
         set_flash(request, "Term removed.")
     return RedirectResponse(url="/manager/glossary", status_code=302)
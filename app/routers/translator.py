@@ -1,36 +1,57 @@
 from typing import Optional
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, Request, UploadFile
+from fastapi import APIRouter, BackgroundTasks, Depends, File, Form, HTTPException, Request, UploadFile
 from fastapi.responses import RedirectResponse
-from sqlalchemy.orm import Session
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session, defer, selectinload
 
 from .. import models
-from ..database import get_db
-from ..dependencies import ROLE_MANAGER, ROLE_TRANSLATOR, require_role
+from ..database import get_db, strict_options
+from ..dependencies import require_translator
 from ..services import jobs as job_service
 from ..services.audit import log_action
-from ..services.emails import send_email
+from ..services.cache import list_manager_usernames
+from ..services.emails import queue_email
 from ..services.jobs import run_quality_checks, save_deliverable
 from ..template_loader import templates
 from ..utils.flash import pop_flash, set_flash
 
 router = APIRouter()
+ACTIVE_JOB_STATUSES = ("Assigned", "InProgress")
+DASHBOARD_JOB_LIMIT = 50
 
 
 @router.get("/translator/dashboard")
 def dashboard(
     request: Request,
-    user: models.User = Depends(require_role(ROLE_TRANSLATOR)),
+    user: models.User = Depends(require_translator),
     db: Session = Depends(get_db),
 ):
     jobs = (
         db.query(models.Job)
+        .options(
+            *strict_options(
+                defer(models.Job.translated_text),
+                selectinload(models.Job.request).options(
+                    defer(models.TranslationRequest.source_text),
+                    selectinload(models.TranslationRequest.client),
+                ),
+            )
+        )
         .filter(models.Job.translator_id == user.id)
-        .order_by(models.Job.id.desc())
+        # Open work first so it is never pushed out of the list by older jobs.
+        .order_by(case((models.Job.status.in_(ACTIVE_JOB_STATUSES), 0), else_=1), models.Job.id.desc())
+        .limit(DASHBOARD_JOB_LIMIT)
         .all()
     )
-    active_jobs = sum(1 for job in jobs if job.status in {"Assigned", "InProgress"})
-    delivered_jobs = sum(1 for job in jobs if job.status == "Delivered")
+    active_jobs, delivered_jobs = (
+        db.query(
+            func.count().filter(models.Job.status.in_(ACTIVE_JOB_STATUSES)),
+            func.count().filter(models.Job.status == "Delivered"),
+        )
+        .filter(models.Job.translator_id == user.id)
+        .one()
+    )
     flash = pop_flash(request)
     return templates.TemplateResponse(
         "translator_dashboard.html",
@@ -48,14 +69,16 @@ def dashboard(
 @router.post("/translator/jobs/{job_id}/start")
 def start_job(
     job_id: int,
-    user: models.User = Depends(require_role(ROLE_TRANSLATOR)),
+    request: Request,
+    user: models.User = Depends(require_translator),
     db: Session = Depends(get_db),
 ):
-    job = db.get(models.Job, job_id)
+    job = job_service.load_job(db, job_id)
     if not job or job.translator_id != user.id:
         raise HTTPException(status_code=404, detail="Job not found")
     job_service.update_job_status(db, job, "InProgress")
     log_action(db, user, "job_started", "job", job.id)
+    db.commit()
     set_flash(request, "Job marked as In Progress.")
     return RedirectResponse(url="/translator/dashboard", status_code=302)
 
@@ -64,12 +87,13 @@ def start_job(
 def deliver_job(
     request: Request,
     job_id: int,
+    background_tasks: BackgroundTasks,
     translated_text: str = Form(""),
     deliverable: Optional[UploadFile] = File(None),
-    user: models.User = Depends(require_role(ROLE_TRANSLATOR)),
+    user: models.User = Depends(require_translator),
     db: Session = Depends(get_db),
 ):
-    job = db.get(models.Job, job_id)
+    job = job_service.load_job(db, job_id)
     if not job or job.translator_id != user.id:
         raise HTTPException(status_code=404, detail="Job not found")
     if not deliverable and not translated_text.strip():
@@ -82,13 +106,15 @@ def deliver_job(
     checks = run_quality_checks(job.request.source_text, translated_text)
     job_service.update_job_status(db, job, "Delivered")
     log_action(db, user, "job_delivered", "job", job.id)
+    db.commit()
     if not checks.get("numbers_match"):
         set_flash(request, "Warning: numbers differ between source and translation.", "warning")
     else:
         set_flash(request, "Deliverable uploaded successfully.")
-    manager_recipients = [m.username for m in db.query(models.User).filter(models.User.role == ROLE_MANAGER).all()]
+    manager_recipients = list_manager_usernames(db)
     recipients = [job.request.client.username] + manager_recipients
-    send_email(
+    queue_email(
+        background_tasks,
         subject="Job Delivered",
         recipients=recipients,
         template_name="job_delivered.html",
@@ -0,0 +1,51 @@
+from pathlib import PurePosixPath
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session, joinedload
+
+from .. import models
+from ..database import get_db
+from ..dependencies import ROLE_ADMIN, ROLE_MANAGER, login_required, require_job_participant
+from ..services import jobs as job_service
+from ..services.files import upload_file_response
+
+router = APIRouter()
+
+
+def _can_view_request(user: models.User, translation_request: models.TranslationRequest) -> bool:
+    if user.role in {ROLE_MANAGER, ROLE_ADMIN} or translation_request.client_id == user.id:
+        return True
+    return bool(translation_request.job and translation_request.job.translator_id == user.id)
+
+
+@router.get("/uploads/{file_path:path}")
+def download_upload(
+    file_path: str,
+    user: models.User = Depends(login_required),
+    db: Session = Depends(get_db),
+):
+    parts = PurePosixPath(file_path).parts
+    if not parts or ".." in parts or file_path.startswith("/"):
+        raise HTTPException(status_code=404, detail="File not found")
+    if parts[0] == "deliverables":
+        if len(parts) < 3 or not parts[1].isdigit():
+            raise HTTPException(status_code=404, detail="File not found")
+        require_job_participant(int(parts[1]), db, user)
+    elif parts[0] == "invoices":
+        invoice = (
+            db.query(models.Invoice)
+            .options(joinedload(models.Invoice.job).joinedload(models.Job.request))
+            .filter(models.Invoice.pdf_path == file_path)
+            .first()
+        )
+        if not invoice or not job_service.can_view_job(user, invoice.job):
+            raise HTTPException(status_code=404, detail="File not found")
+    else:
+        translation_request = (
+            db.query(models.TranslationRequest)
+            .filter(models.TranslationRequest.original_filename == file_path)
+            .first()
+        )
+        if not translation_request or not _can_view_request(user, translation_request):
+            raise HTTPException(status_code=404, detail="File not found")
+    return upload_file_response(file_path)
@@ -1,21 +1,81 @@
-from typing import Optional
+import asyncio
+import hashlib
+import hmac
+import os
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
 
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
 from passlib.context import CryptContext
 
+ARGON2_PREFIX = "$argon2"
+
+# OWASP's minimum Argon2id profile (19 MiB, 2 passes); hashes made with other
+# parameters are upgraded on the next successful login.
+password_hasher = PasswordHasher(
+    time_cost=int(os.getenv("ARGON2_TIME_COST", "2")),
+    memory_cost=int(os.getenv("ARGON2_MEMORY_COST", "19456")),
+    parallelism=1,
+)
+# Only used to verify bcrypt hashes created before the switch to Argon2id.
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Dedicated pool so password hashing never starves the request threadpool.
+_kdf_executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="kdf")
+# Verifications currently running, keyed by a digest of (username, hash, password).
+_inflight_verifications: Dict[str, "asyncio.Future[bool]"] = {}
+
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return password_hasher.hash(password)
+
+
+# Verified against when the username is unknown so both login branches pay the same KDF cost.
+DUMMY_PASSWORD_HASH = get_password_hash(secrets.token_urlsafe(16))
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     if not hashed_password:
         return False
-    return pwd_context.verify(plain_password, hashed_password)
+    if not hashed_password.startswith(ARGON2_PREFIX):
+        return pwd_context.verify(plain_password, hashed_password)
+    try:
+        return password_hasher.verify(hashed_password, plain_password)
+    except (VerificationError, InvalidHashError):
+        return False
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    if not hashed_password.startswith(ARGON2_PREFIX):
+        return True
+    return password_hasher.check_needs_rehash(hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(_kdf_executor, get_password_hash, password)
+
+
+async def verify_password_async(username: str, plain_password: str, hashed_password: str) -> bool:
+    """Verify off the event loop, sharing one KDF run between identical concurrent attempts."""
+    # The username is part of the key so attempts against different unknown accounts, which all
+    # check DUMMY_PASSWORD_HASH, still pay for their own KDF run.
+    key = hashlib.sha256(f"{username}\0{hashed_password}\0{plain_password}".encode()).hexdigest()
+    pending = _inflight_verifications.get(key)
+    if pending is not None:
+        return await asyncio.shield(pending)
+    pending = asyncio.get_running_loop().run_in_executor(
+        _kdf_executor, verify_password, plain_password, hashed_password
+    )
+    _inflight_verifications[key] = pending
+    try:
+        return await asyncio.shield(pending)
+    finally:
+        _inflight_verifications.pop(key, None)
 
 
 def safe_compare(a: Optional[str], b: Optional[str]) -> bool:
     if a is None or b is None:
         return False
-    return pwd_context.identify(b"dummy") is not None and a == b
+    return hmac.compare_digest(a.encode(), b.encode())
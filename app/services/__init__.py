@@ -0,0 +1,8 @@
+"""Domain helpers shared by the routers.
+
+Services stage changes on the session they are given and never commit:
+they ``flush`` only when a caller needs a generated id. The route handler
+owns the transaction and commits once, after the change and its audit
+entry are both staged. Helpers that run outside a request (the
+``*_in_background`` functions) open and commit their own session.
+"""
@@ -1,9 +1,9 @@
-from datetime import datetime
 from typing import Optional
 
 from sqlalchemy.orm import Session
 
 from .. import models
+from ..database import SessionLocal
 
 
 def log_action(
@@ -13,12 +13,34 @@ def log_action(
     object_type: str,
     object_id: Optional[int] = None,
 ) -> None:
+    """Stage an audit entry; it is written by the caller's next commit."""
     log = models.AuditLog(
         user_id=user.id if user else None,
         action=action,
         object_type=object_type,
         object_id=object_id,
-        created_at=datetime.utcnow(),
     )
     db.add(log)
-    db.commit()
+    db.flush()
+
+
+def log_action_in_background(
+    user_id: Optional[int],
+    action: str,
+    object_type: str,
+    object_id: Optional[int] = None,
+) -> None:
+    """Write an audit entry after the response is sent, using a short-lived session."""
+    db = SessionLocal()
+    try:
+        db.add(
+            models.AuditLog(
+                user_id=user_id,
+                action=action,
+                object_type=object_type,
+                object_id=object_id,
+            )
+        )
+        db.commit()
+    finally:
+        db.close()
@@ -0,0 +1,43 @@
+from threading import Lock
+from typing import List, Optional
+
+from cachetools import TTLCache, cached
+from cachetools.keys import hashkey
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..dependencies import ROLE_MANAGER, ROLE_TRANSLATOR
+
+# Rates and the translator roster change rarely, so a short-lived in-process
+# cache saves a query on every quote and manager dashboard render.
+rate_cache: TTLCache = TTLCache(maxsize=512, ttl=300)
+translator_cache: TTLCache = TTLCache(maxsize=1, ttl=300)
+manager_cache: TTLCache = TTLCache(maxsize=1, ttl=60)
+
+
+def _rate_key(db: Session, source_language: str, target_language: str):
+    return hashkey(source_language, target_language)
+
+
+@cached(rate_cache, key=_rate_key, lock=Lock())
+def get_unit_price(db: Session, source_language: str, target_language: str) -> Optional[float]:
+    rate = (
+        db.query(models.Rate.unit_price)
+        .filter(
+            models.Rate.source_language == source_language,
+            models.Rate.target_language == target_language,
+        )
+        .first()
+    )
+    return rate.unit_price if rate else None
+
+
+@cached(translator_cache, key=lambda db: hashkey(), lock=Lock())
+def list_translators(db: Session) -> List[Row]:
+    return db.query(models.User.id, models.User.username).filter(models.User.role == ROLE_TRANSLATOR).all()
+
+
+@cached(manager_cache, key=lambda db: hashkey(), lock=Lock())
+def list_manager_usernames(db: Session) -> List[str]:
+    return [username for (username,) in db.query(models.User.username).filter(models.User.role == ROLE_MANAGER)]
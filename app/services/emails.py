@@ -1,41 +1,99 @@
 import logging
 import os
+import queue
 import smtplib
 from email.message import EmailMessage
 from pathlib import Path
-from typing import Any, Dict, Iterable
+from typing import Any, Dict, Iterable, List
 
+from fastapi import BackgroundTasks
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 
+from ..template_loader import bytecode_cache
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 TEMPLATE_DIR = BASE_DIR / "templates" / "emails"
 
-
-def _create_environment() -> Environment:
-    loader = FileSystemLoader(str(TEMPLATE_DIR))
-    return Environment(loader=loader, autoescape=select_autoescape(["html", "xml"]))
+environment = Environment(
+    loader=FileSystemLoader(str(TEMPLATE_DIR)),
+    autoescape=select_autoescape(["html", "xml"]),
+    bytecode_cache=bytecode_cache,
+    auto_reload=os.getenv("ENV") == "dev",
+)
 
 
 def _is_configured() -> bool:
     return bool(os.getenv("SMTP_HOST"))
 
 
+def _close_quietly(server: smtplib.SMTP) -> None:
+    try:
+        server.quit()
+    except (smtplib.SMTPException, OSError):
+        server.close()
+
+
+class _SMTPPool:
+    """Keeps logged-in SMTP connections so bursts of notifications skip the TLS and auth handshake."""
+
+    def __init__(self, size: int) -> None:
+        self._idle: "queue.LifoQueue[smtplib.SMTP]" = queue.LifoQueue(maxsize=size)
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(os.getenv("SMTP_HOST"), int(os.getenv("SMTP_PORT", "587")))
+        if os.getenv("SMTP_STARTTLS", "1") == "1":
+            server.starttls()
+        username = os.getenv("SMTP_USERNAME")
+        password = os.getenv("SMTP_PASSWORD")
+        if username and password:
+            server.login(username, password)
+        return server
+
+    def get(self) -> smtplib.SMTP:
+        while True:
+            try:
+                server = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+            # Servers drop idle sessions; only hand out connections that still answer.
+            try:
+                if server.noop()[0] == 250:
+                    return server
+            except (smtplib.SMTPException, OSError):
+                pass
+            _close_quietly(server)
+
+    def put(self, server: smtplib.SMTP) -> None:
+        try:
+            self._idle.put_nowait(server)
+        except queue.Full:
+            _close_quietly(server)
+
+
+_smtp_pool = _SMTPPool(int(os.getenv("SMTP_POOL_SIZE", "2")))
+
+
 def render_template(name: str, context: Dict[str, Any]) -> str:
-    env = _create_environment()
-    template = env.get_template(name)
-    return template.render(**context)
+    return environment.get_template(name).render(**context)
 
 
-def send_email(subject: str, recipients: Iterable[str], template_name: str, context: Dict[str, Any]) -> None:
+def queue_email(
+    background_tasks: BackgroundTasks,
+    subject: str,
+    recipients: Iterable[str],
+    template_name: str,
+    context: Dict[str, Any],
+) -> None:
+    """Render now, while ORM objects in ``context`` are still bound, and send after the response."""
     body = render_template(template_name, context)
+    background_tasks.add_task(deliver_email, subject, list(recipients), body)
+
+
+def deliver_email(subject: str, recipients: List[str], body: str) -> None:
     if not _is_configured():
         logging.info("Email (mocked) %s -> %s\n%s", subject, ", ".join(recipients), body)
         return
-    host = os.getenv("SMTP_HOST")
-    port = int(os.getenv("SMTP_PORT", "587"))
-    username = os.getenv("SMTP_USERNAME")
-    password = os.getenv("SMTP_PASSWORD")
-    sender = os.getenv("SMTP_SENDER", username)
+    sender = os.getenv("SMTP_SENDER", os.getenv("SMTP_USERNAME"))
 
     message = EmailMessage()
     message["Subject"] = subject
@@ -43,9 +101,10 @@ def send_email(subject: str, recipients: Iterable[str], template_name: str, cont
     message["To"] = ", ".join(recipients)
     message.set_content(body, subtype="html")
 
-    with smtplib.SMTP(host, port) as server:
-        if os.getenv("SMTP_STARTTLS", "1") == "1":
-            server.starttls()
-        if username and password:
-            server.login(username, password)
+    server = _smtp_pool.get()
+    try:
         server.send_message(message)
+    except Exception:
+        _close_quietly(server)
+        raise
+    _smtp_pool.put(server)
@@ -1,39 +1,122 @@
-import html
+import os
 import re
+import shutil
+from collections import Counter
 from pathlib import Path
-from typing import Tuple
+from threading import Lock
+from typing import Optional, Tuple
+from urllib.parse import quote
 
+import pypdfium2 as pdfium
 from docx import Document
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import FileResponse, Response
 from pdfminer.high_level import extract_text as pdf_extract_text
 
+UPLOAD_ROOT = Path("uploads")
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# Internal nginx location aliased to the uploads directory, e.g. "/protected-uploads".
+ACCEL_REDIRECT_PREFIX = os.getenv("UPLOADS_ACCEL_REDIRECT")
+# Leading bytes expected for binary upload types; types not listed are not sniffed.
+UPLOAD_SIGNATURES = {
+    "application/pdf": b"%PDF-",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": b"PK\x03\x04",
+    "application/msword": b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1",
+}
+# Set to "pdfminer" to fall back to the pure-Python extractor.
+PDF_TEXT_BACKEND = os.getenv("PDF_TEXT_BACKEND", "pdfium")
+# PDFium keeps global state; only one thread may use it at a time.
+_pdfium_lock = Lock()
+WORD_PATTERN = re.compile(r"\b\w+\b")
+NUMBER_PATTERN = re.compile(r"\d+(?:[\.,]\d+)?")
+# html.escape(quote=True) plus newline -> <br>, applied in a single pass.
+MESSAGE_TRANSLATION = str.maketrans(
+    {"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#x27;", "\n": "<br>"}
+)
+
+
+def save_upload(upload: UploadFile, destination: Path) -> Path:
+    """Stream an uploaded file to disk without loading it into memory."""
+    with destination.open("wb") as f:
+        shutil.copyfileobj(upload.file, f, UPLOAD_CHUNK_SIZE)
+    upload.file.close()
+    return destination
+
+
+def has_expected_signature(upload: UploadFile) -> bool:
+    """Check the upload's magic bytes match its declared content type."""
+    signature = UPLOAD_SIGNATURES.get(upload.content_type)
+    if signature is None:
+        return True
+    head = upload.file.read(len(signature))
+    upload.file.seek(0)
+    return head == signature
+
+
+def upload_file_response(
+    relative_path: str, media_type: Optional[str] = None, filename: Optional[str] = None
+) -> Response:
+    """Serve a file under ``uploads/``, handing the transfer to nginx when configured."""
+    if ACCEL_REDIRECT_PREFIX:
+        # Stored names embed client-supplied filenames, so percent-encode them for nginx.
+        headers = {"X-Accel-Redirect": f"{ACCEL_REDIRECT_PREFIX.rstrip('/')}/{quote(relative_path)}"}
+        if filename:
+            # Same encoding FileResponse uses: plain quoted name, or RFC 5987 when it needs escaping.
+            quoted_filename = quote(filename)
+            if quoted_filename != filename:
+                headers["Content-Disposition"] = f"attachment; filename*=utf-8''{quoted_filename}"
+            else:
+                headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return Response(headers=headers, media_type=media_type)
+    filepath = UPLOAD_ROOT / relative_path
+    if not filepath.is_file():
+        raise HTTPException(status_code=404, detail="File not found")
+    return FileResponse(filepath, media_type=media_type, filename=filename)
+
+
+def _extract_pdf_text(path: Path) -> str:
+    if PDF_TEXT_BACKEND == "pdfminer":
+        return pdf_extract_text(str(path)) or ""
+    # Held from open to close: uploads are extracted on the request threadpool.
+    with _pdfium_lock:
+        pdf = pdfium.PdfDocument(str(path))
+        try:
+            pages = []
+            for page in pdf:
+                textpage = page.get_textpage()
+                pages.append(textpage.get_text_range().replace("\r\n", "\n"))
+                textpage.close()
+                page.close()
+            return "\n".join(pages)
+        finally:
+            pdf.close()
+
 
 def extract_text_from_file(path: Path) -> Tuple[str, str]:
     """Return extracted text and detected extension."""
     suffix = path.suffix.lower()
     text = ""
     if suffix == ".pdf":
-        text = pdf_extract_text(str(path)) or ""
+        text = _extract_pdf_text(path)
     elif suffix == ".docx":
         document = Document(str(path))
-        paragraphs = [p.text for p in document.paragraphs]
-        text = "\n".join(paragraphs)
+        text = "\n".join(p.text for p in document.paragraphs)
     else:
         text = path.read_text(encoding="utf-8", errors="ignore")
     return text, suffix
 
 
 def count_words(text: str) -> int:
-    words = re.findall(r"\b\w+\b", text)
-    return len(words)
+    return len(WORD_PATTERN.findall(text))
 
 
 def sanitize_message(text: str) -> str:
-    safe_text = text.strip()[:1000]
-    return html.escape(safe_text).replace("\n", "<br>")
+    return text.strip()[:1000].translate(MESSAGE_TRANSLATION)
 
 
 def compare_numbers(source: str, target: str) -> bool:
-    pattern = re.compile(r"\d+(?:[\.,]\d+)?")
-    source_numbers = sorted(pattern.findall(source))
-    target_numbers = sorted(pattern.findall(target))
-    return source_numbers == target_numbers
+    source_numbers = NUMBER_PATTERN.findall(source)
+    target_numbers = NUMBER_PATTERN.findall(target)
+    if len(source_numbers) != len(target_numbers):
+        return False
+    return Counter(source_numbers) == Counter(target_numbers)
@@ -1,45 +1,124 @@
-from datetime import datetime
+import logging
+import os
+import uuid
+from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Set
 
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import mm
 from reportlab.pdfgen import canvas
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from .. import models
+from ..database import SessionLocal
 
 INVOICE_DIR = Path("uploads/invoices")
-INVOICE_DIR.mkdir(parents=True, exist_ok=True)
+# Invoices with a background render scheduled or running in this process.
+_rendering_invoices: Set[int] = set()
+_rendering_lock = Lock()
+
+
+@lru_cache(maxsize=1)
+def _invoice_dir() -> Path:
+    """Create the invoice directory on first use instead of at import."""
+    INVOICE_DIR.mkdir(parents=True, exist_ok=True)
+    return INVOICE_DIR
 
 
 def _next_invoice_number(db: Session) -> int:
-    last_invoice = db.query(models.Invoice).order_by(models.Invoice.id.desc()).first()
-    return (last_invoice.id if last_invoice else 0) + 1
+    return (db.query(func.max(models.Invoice.id)).scalar() or 0) + 1
+
+
+def invoice_details(db: Session, invoice: models.Invoice) -> Dict[str, Any]:
+    """Snapshot everything the PDF prints so rendering needs no session."""
+    job = invoice.job
+    return {
+        "number": invoice.id or _next_invoice_number(db),
+        "client": invoice.client.username,
+        "job_id": job.id,
+        "source_language": job.request.source_language,
+        "target_language": job.request.target_language,
+        "word_count": job.request.word_count,
+        "amount": invoice.amount,
+        "currency": invoice.currency,
+    }
 
 
-def generate_invoice_pdf(db: Session, invoice: models.Invoice) -> Path:
-    number = _next_invoice_number(db)
-    filename = f"invoice_{invoice.id or number}.pdf"
-    filepath = INVOICE_DIR / filename
-    c = canvas.Canvas(str(filepath), pagesize=A4)
+def render_invoice_pdf(details: Dict[str, Any]) -> Path:
+    number = details["number"]
+    filepath = _invoice_dir() / f"invoice_{number}.pdf"
+    # Render to a private file and swap it in, so a concurrent render never leaves a torn PDF.
+    partial = filepath.with_name(f"{filepath.name}.{uuid.uuid4().hex}.tmp")
+    c = canvas.Canvas(str(partial), pagesize=A4)
     width, height = A4
     c.setFont("Helvetica-Bold", 18)
     c.drawString(30 * mm, height - 30 * mm, "Translation Office")
-    c.setFont("Helvetica", 12)
-    c.drawString(30 * mm, height - 40 * mm, f"Invoice #{number:04d}")
-    c.drawString(30 * mm, height - 50 * mm, f"Client: {invoice.client.username}")
-    job = invoice.job
-    c.drawString(30 * mm, height - 60 * mm, f"Job ID: {job.id}")
-    c.drawString(30 * mm, height - 70 * mm, f"Languages: {job.request.source_language} -> {job.request.target_language}")
-    c.drawString(30 * mm, height - 80 * mm, f"Word count: {job.request.word_count}")
-    c.drawString(30 * mm, height - 100 * mm, f"Amount: {invoice.amount:.2f} {invoice.currency}")
-    c.drawString(30 * mm, height - 120 * mm, f"Issued: {datetime.utcnow().date().isoformat()}")
+    # One text object on a 10 mm grid; blank lines keep the gaps before amount and date.
+    text = c.beginText(30 * mm, height - 40 * mm)
+    text.setFont("Helvetica", 12)
+    text.setLeading(10 * mm)
+    text.textLines(
+        [
+            f"Invoice #{number:04d}",
+            f"Client: {details['client']}",
+            f"Job ID: {details['job_id']}",
+            f"Languages: {details['source_language']} -> {details['target_language']}",
+            f"Word count: {details['word_count']}",
+            "",
+            f"Amount: {details['amount']:.2f} {details['currency']}",
+            "",
+            f"Issued: {datetime.now(timezone.utc):%Y-%m-%d}",
+        ],
+        trim=0,
+    )
+    c.drawText(text)
     c.showPage()
-    c.save()
+    try:
+        c.save()
+        os.replace(partial, filepath)
+    except Exception:
+        partial.unlink(missing_ok=True)
+        raise
+    return filepath
+
+
+def finalize_invoice(db: Session, invoice: models.Invoice, filepath: Path) -> models.Invoice:
     invoice.pdf_path = str(filepath.relative_to(Path("uploads")))
     invoice.status = "Issued"
-    invoice.issued_at = datetime.utcnow()
+    invoice.issued_at = datetime.now(timezone.utc)
     db.add(invoice)
-    db.commit()
-    db.refresh(invoice)
-    return filepath
+    return invoice
+
+
+def claim_invoice_render(invoice_id: int) -> bool:
+    """Reserve the invoice for one background render; False if one is already pending here."""
+    with _rendering_lock:
+        if invoice_id in _rendering_invoices:
+            return False
+        _rendering_invoices.add(invoice_id)
+        return True
+
+
+def generate_invoice_pdf_in_background(invoice_id: int, details: Dict[str, Any]) -> None:
+    """Render after the response is sent and mark the invoice issued once the file exists.
+
+    Callers claim the invoice with ``claim_invoice_render`` first; the claim is released here.
+    """
+    db = SessionLocal()
+    try:
+        filepath = render_invoice_pdf(details)
+        invoice = db.get(models.Invoice, invoice_id)
+        if invoice is not None:
+            finalize_invoice(db, invoice, filepath)
+            db.commit()
+    except Exception:
+        # The invoice stays without a pdf_path, so the manager can generate it again.
+        logging.exception("Rendering invoice %s failed", invoice_id)
+    finally:
+        db.close()
+        with _rendering_lock:
+            _rendering_invoices.discard(invoice_id)
@@ -1,16 +1,28 @@
-from datetime import datetime
+import uuid
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional
 
 from fastapi import UploadFile
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 
 from .. import models
 from ..dependencies import ROLE_ADMIN, ROLE_CLIENT, ROLE_MANAGER, ROLE_TRANSLATOR
-from .files import compare_numbers
+from .files import compare_numbers, save_upload
 
 DELIVERABLE_DIR = Path("uploads/deliverables")
-DELIVERABLE_DIR.mkdir(parents=True, exist_ok=True)
+
+
+def load_job(db: Session, job_id: int) -> Optional[models.Job]:
+    """Fetch a job with the request, client and translator that permission checks and pages read."""
+    return db.get(
+        models.Job,
+        job_id,
+        options=[
+            joinedload(models.Job.request).joinedload(models.TranslationRequest.client),
+            joinedload(models.Job.translator),
+        ],
+    )
 
 
 def ensure_job_for_request(db: Session, request: models.TranslationRequest) -> models.Job:
@@ -19,8 +31,6 @@ def ensure_job_for_request(db: Session, request: models.TranslationRequest) -> m
     job = models.Job(request=request, status="New")
     request.status = "New"
     db.add(job)
-    db.commit()
-    db.refresh(job)
     return job
 
 
@@ -40,8 +50,6 @@ def assign_translator(
     job.due_date = due_date
     job.notes = notes
     db.add(job)
-    db.commit()
-    db.refresh(job)
     return job
 
 
@@ -49,21 +57,17 @@ def update_job_status(db: Session, job: models.Job, status: str) -> models.Job:
     job.status = status
     job.request.status = status
     if status == "Delivered":
-        job.delivered_at = datetime.utcnow()
+        job.delivered_at = datetime.now(timezone.utc)
     db.add(job)
-    db.commit()
-    db.refresh(job)
     return job
 
 
 def save_deliverable(job: models.Job, upload: UploadFile) -> Path:
     job_dir = DELIVERABLE_DIR / str(job.id)
     job_dir.mkdir(parents=True, exist_ok=True)
-    filename = f"{datetime.utcnow().strftime('%Y%m%d%H%M%S')}_{upload.filename}"
-    destination = job_dir / filename
-    with destination.open("wb") as f:
-        f.write(upload.file.read())
-    upload.file.close()
+    # A random prefix keeps two uploads in the same second from overwriting each other.
+    filename = f"{uuid.uuid4().hex}_{upload.filename}"
+    destination = save_upload(upload, job_dir / filename)
     job.delivered_filename = str(destination.relative_to(Path("uploads")))
     return destination
 
@@ -1,22 +1,25 @@
-from datetime import datetime
 from typing import Optional
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 
 from .. import models
+from .cache import get_unit_price
 
 
 DEFAULT_CURRENCY = "EUR"
 
 
-def get_rate(db: Session, source_language: str, target_language: str) -> Optional[models.Rate]:
-    return (
-        db.query(models.Rate)
-        .filter(
-            models.Rate.source_language == source_language,
-            models.Rate.target_language == target_language,
-        )
-        .first()
+def load_quote(db: Session, quote_id: int) -> Optional[models.Quote]:
+    """Fetch a quote with its request, client and job in one query."""
+    return db.get(
+        models.Quote,
+        quote_id,
+        options=[
+            joinedload(models.Quote.request).options(
+                joinedload(models.TranslationRequest.client),
+                joinedload(models.TranslationRequest.job),
+            )
+        ],
     )
 
 
@@ -27,9 +30,9 @@ def create_or_update_quote(
     unit_price: Optional[float] = None,
     currency: str = DEFAULT_CURRENCY,
 ) -> models.Quote:
-    rate = get_rate(db, request.source_language, request.target_language)
     if unit_price is None:
-        unit_price = rate.unit_price if rate else 0.1
+        rate_price = get_unit_price(db, request.source_language, request.target_language)
+        unit_price = rate_price if rate_price is not None else 0.1
     total = round(word_count * unit_price, 2)
     if request.quote:
         quote = request.quote
@@ -45,18 +48,14 @@ def create_or_update_quote(
             currency=currency,
             total=total,
             status="Draft",
-            created_at=datetime.utcnow(),
         )
         db.add(quote)
     request.word_count = word_count
-    db.commit()
-    db.refresh(quote)
+    db.flush()
     return quote
 
 
 def mark_quote_status(db: Session, quote: models.Quote, status: str) -> models.Quote:
     quote.status = status
     db.add(quote)
-    db.commit()
-    db.refresh(quote)
     return quote
@@ -1,7 +1,23 @@
+import os
 from pathlib import Path
 
 from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
 
 BASE_DIR = Path(__file__).resolve().parent
+BYTECODE_CACHE_DIR = Path(os.getenv("JINJA_CACHE_DIR", str(BASE_DIR.parent / ".jinja_cache")))
+BYTECODE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
-templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
+# Shared by every Jinja environment in the app so templates compile once per deployment.
+bytecode_cache = FileSystemBytecodeCache(str(BYTECODE_CACHE_DIR))
+
+environment = Environment(
+    loader=FileSystemLoader(str(BASE_DIR / "templates")),
+    autoescape=True,
+    # Compiled templates survive worker restarts; mtime checks only happen in development.
+    bytecode_cache=bytecode_cache,
+    auto_reload=os.getenv("ENV") == "dev",
+    cache_size=400,
+)
+
+templates = Jinja2Templates(env=environment)
@@ -11,7 +11,4 @@ def set_flash(request: Request, message: str, category: str = "success") -> None
 
 
 def pop_flash(request: Request) -> Optional[dict]:
-    data = request.session.get(FLASH_KEY)
-    if data:
-        request.session.pop(FLASH_KEY, None)
-    return data
+    return request.session.pop(FLASH_KEY, None)